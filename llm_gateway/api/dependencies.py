@@ -1,5 +1,6 @@
 from typing import Dict, Optional, List
 from fastapi import Depends, Request
+import functools
 import logging
 from ..config import settings
 from ..core.errors import (
@@ -11,20 +12,29 @@ from ..services.factory import service_factory
 
 logger = logging.getLogger("llm_gateway.api.dependencies")
 
+@functools.lru_cache(maxsize=16)
+def _get_service_cached(provider_name: Optional[str]) -> BaseLLMService:
+    """Resolve a provider name to its service instance, cached per process.
+
+    Services are singletons inside the factory, so the resolution is
+    stateless and safe to memoize; failed lookups raise and are not cached.
+    """
+    return service_factory.get_service(provider_name)
+
 def get_service(provider_name: Optional[str] = None) -> BaseLLMService:
     """
     Get a service instance for the specified provider.
-    
+
     Args:
         provider_name: The name of the provider. If None, the default provider is used.
-    
+
     Returns:
         A service instance for the specified provider.
-    
+
     Raises:
         ServiceUnavailableError: If the provider is not available.
     """
-    return service_factory.get_service(provider_name)
+    return _get_service_cached(provider_name)
 
 async def get_service_for_model(
     model_id: str, 
@@ -61,7 +71,7 @@ async def get_all_services() -> List[BaseLLMService]:
 
 def get_request_id(request: Request) -> str:
     """
-    Get the request ID from the request state.
+    Get the request ID assigned by the logging middleware.
     
     Args:
         request: The FastAPI request object.
@@ -69,4 +79,4 @@ def get_request_id(request: Request) -> str:
     Returns:
         The request ID as a string.
     """
-    return getattr(request.state, "request_id", "unknown") 
\ No newline at end of file
+    return request.scope.get("x_request_id", "unknown") 
\ No newline at end of file
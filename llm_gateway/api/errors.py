@@ -1,5 +1,7 @@
-from fastapi import Request, status
-from fastapi.responses import JSONResponse
+import functools
+import orjson
+from fastapi import Request, Response, status
+from fastapi.responses import ORJSONResponse
 from ..core.errors import (
     LLMGatewayError,
     InvalidRequestError,
@@ -15,31 +17,49 @@ import logging
 
 logger = logging.getLogger("llm_gateway.api.errors")
 
+# Serialized once at import: the generic 500 body never varies, so the
+# handler can answer without building a dict or re-encoding JSON
+_GENERIC_500_BODY = orjson.dumps({
+    "error": {
+        "code": "internal_server_error",
+        "message": "An unexpected error occurred."
+    }
+})
+
+@functools.lru_cache(maxsize=128)
+def _render_error_body(error_code: str, message: str) -> bytes:
+    """Serialize a detail-less gateway error body, cached per code+message."""
+    return orjson.dumps({"error": {"code": error_code, "message": message}})
+
 async def generic_error_handler(request: Request, exc: Exception):
     """Handle any unhandled exceptions."""
-    error_id = request.state.request_id if hasattr(request.state, "request_id") else "unknown"
-    
-    logger.error(f"Unhandled error {error_id}: {str(exc)}", exc_info=True)
-    
-    return JSONResponse(
-        status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-        content={
-            "error": {
-                "code": "internal_server_error",
-                "message": "An unexpected error occurred."
-            }
-        }
+    error_id = request.scope.get("x_request_id", "unknown")
+
+    logger.error("Unhandled error %s: %s", error_id, exc, exc_info=True)
+
+    return Response(
+        content=_GENERIC_500_BODY,
+        media_type="application/json",
+        status_code=status.HTTP_500_INTERNAL_SERVER_ERROR
     )
 
 async def gateway_error_handler(request: Request, exc: LLMGatewayError):
     """Handle LLM Gateway specific errors."""
-    error_id = request.state.request_id if hasattr(request.state, "request_id") else "unknown"
-    
-    logger.error(f"Gateway error {error_id}: {exc.error_code} - {exc.error_message}")
-    
-    return JSONResponse(
-        status_code=exc.status_code,
-        content=exc.to_dict()
+    error_id = request.scope.get("x_request_id", "unknown")
+
+    logger.error("Gateway error %s: %s - %s", error_id, exc.error_code, exc.error_message)
+
+    # Errors with details carry request-specific payloads; everything else
+    # (auth failures, rate limits) repeats a handful of constant bodies
+    if exc.details:
+        return ORJSONResponse(
+            status_code=exc.status_code,
+            content=exc.to_dict()
+        )
+    return Response(
+        content=_render_error_body(exc.error_code, exc.error_message),
+        media_type="application/json",
+        status_code=exc.status_code
     )
 
 def register_exception_handlers(app):
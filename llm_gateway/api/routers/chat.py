@@ -1,4 +1,5 @@
 from fastapi import APIRouter, Depends, Request, HTTPException, status
+from fastapi.responses import ORJSONResponse, StreamingResponse
 from typing import Optional
 import time
 import uuid
@@ -6,7 +7,7 @@ import logging
 
 from ...core.models import ChatCompletionRequest, ChatCompletionResponse
 from ...core.errors import ModelNotFoundError, ServiceUnavailableError, ProviderError
-from ...core.utils import create_cache_key, cache_get, cache_set
+from ...core.utils import create_cache_key_from_bytes, cache_get, cache_set
 from ...config import settings
 from ..dependencies import get_service_for_model, get_request_id
 
@@ -14,7 +15,11 @@ logger = logging.getLogger("llm_gateway.api.routers.chat")
 
 router = APIRouter(prefix="/v1", tags=["Chat Completions"])
 
-@router.post("/chat/completions", response_model=ChatCompletionResponse)
+# Bound once at import: settings are static for the process lifetime and a
+# module-global read is cheaper than Pydantic attribute access per request
+_CACHE_ENABLED = settings.CACHE_ENABLED
+
+@router.post("/chat/completions", response_model=ChatCompletionResponse, response_class=ORJSONResponse)
 async def create_chat_completion(
     request: Request,
     body: ChatCompletionRequest,
@@ -27,19 +32,36 @@ async def create_chat_completion(
     It supports the same parameters as the OpenAI Chat API, but with the
     addition of a 'provider' parameter to specify which provider to use.
     """
-    start_time = time.time()
+    start_time = time.perf_counter_ns()
     
     model = body.model
     provider = body.provider
     
-    logger.info(f"Request {request_id} | Chat completion with model '{model}' and provider '{provider or 'default'}'")
+    logger.info("Request %s | Chat completion with model '%s' and provider '%s'", request_id, model, provider or "default")
+    
+    # Stream straight through: provider SSE frames are piped to the client
+    # without materializing the completion or re-encoding it in Python
+    if body.stream:
+        try:
+            service = await get_service_for_model(model, provider)
+            return StreamingResponse(
+                service.stream_chat_completion(body),
+                media_type="text/event-stream"
+            )
+        except (ModelNotFoundError, ServiceUnavailableError, ProviderError) as e:
+            logger.error("Request %s | Streaming error: %s", request_id, e)
+            raise e
     
-    # Try to get from cache if caching is enabled
-    if settings.CACHE_ENABLED and not body.stream:
-        cache_key = create_cache_key("chat", body.dict())
+    # Try to get from cache if caching is enabled. The key hashes the raw
+    # request bytes (already read by FastAPI when parsing the body), avoiding
+    # a second serialization walk over the messages payload; it is computed
+    # once per request and reused on the write path below.
+    cache_key = None
+    if _CACHE_ENABLED and not body.stream:
+        cache_key = create_cache_key_from_bytes("chat", await request.body())
         cached_response = await cache_get(cache_key)
         if cached_response:
-            logger.info(f"Request {request_id} | Cache hit for model '{model}'")
+            logger.info("Request %s | Cache hit for model '%s'", request_id, model)
             return ChatCompletionResponse(**cached_response)
     
     try:
@@ -49,25 +71,25 @@ async def create_chat_completion(
         # Create the chat completion
         response = await service.create_chat_completion(body)
         
-        # Store in cache if needed
-        if settings.CACHE_ENABLED and not body.stream:
-            await cache_set(create_cache_key("chat", body.dict()), response.dict())
+        # Store in cache if needed, reusing the cache key computed above
+        if cache_key:
+            await cache_set(cache_key, response.model_dump())
         
-        duration = time.time() - start_time
-        logger.info(f"Request {request_id} | Completed in {duration:.2f}s")
+        duration = (time.perf_counter_ns() - start_time) / 1e9
+        logger.info("Request %s | Completed in %.2fs", request_id, duration)
         
         return response
     except ModelNotFoundError as e:
-        logger.error(f"Request {request_id} | Model not found: {model}")
+        logger.error("Request %s | Model not found: %s", request_id, model)
         raise e
     except ServiceUnavailableError as e:
-        logger.error(f"Request {request_id} | Service unavailable for provider: {provider}")
+        logger.error("Request %s | Service unavailable for provider: %s", request_id, provider)
         raise e
     except ProviderError as e:
-        logger.error(f"Request {request_id} | Provider error: {str(e)}")
+        logger.error("Request %s | Provider error: %s", request_id, e)
         raise e
     except Exception as e:
-        logger.error(f"Request {request_id} | Unexpected error: {str(e)}", exc_info=True)
+        logger.error("Request %s | Unexpected error: %s", request_id, e, exc_info=True)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Unexpected error: {str(e)}"
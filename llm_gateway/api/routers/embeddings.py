@@ -1,11 +1,12 @@
 from fastapi import APIRouter, Depends, Request, HTTPException, status
+from fastapi.responses import ORJSONResponse
 from typing import Optional
 import time
 import logging
 
 from ...core.models import EmbeddingRequest, EmbeddingResponse
 from ...core.errors import ModelNotFoundError, ServiceUnavailableError, ProviderError
-from ...core.utils import create_cache_key, cache_get, cache_set
+from ...core.utils import create_cache_key_from_bytes, cache_get, cache_set
 from ...config import settings
 from ..dependencies import get_service_for_model, get_request_id
 
@@ -13,7 +14,11 @@ logger = logging.getLogger("llm_gateway.api.routers.embeddings")
 
 router = APIRouter(prefix="/v1", tags=["Embeddings"])
 
-@router.post("/embeddings", response_model=EmbeddingResponse)
+# Bound once at import: settings are static for the process lifetime and a
+# module-global read is cheaper than Pydantic attribute access per request
+_CACHE_ENABLED = settings.CACHE_ENABLED
+
+@router.post("/embeddings", response_model=EmbeddingResponse, response_class=ORJSONResponse)
 async def create_embeddings(
     request: Request,
     body: EmbeddingRequest,
@@ -26,19 +31,23 @@ async def create_embeddings(
     It supports the same parameters as the OpenAI Embeddings API, but with the
     addition of a 'provider' parameter to specify which provider to use.
     """
-    start_time = time.time()
+    start_time = time.perf_counter_ns()
     
     model = body.model
     provider = body.provider
     
-    logger.info(f"Request {request_id} | Embeddings with model '{model}' and provider '{provider or 'default'}'")
+    logger.info("Request %s | Embeddings with model '%s' and provider '%s'", request_id, model, provider or "default")
     
-    # Try to get from cache if caching is enabled
-    if settings.CACHE_ENABLED:
-        cache_key = create_cache_key("embedding", body.dict())
+    # Try to get from cache if caching is enabled. The key hashes the raw
+    # request bytes (already read by FastAPI when parsing the body), avoiding
+    # a second serialization walk over the input payload; it is computed once
+    # per request and reused on the write path below.
+    cache_key = None
+    if _CACHE_ENABLED:
+        cache_key = create_cache_key_from_bytes("embedding", await request.body())
         cached_response = await cache_get(cache_key)
         if cached_response:
-            logger.info(f"Request {request_id} | Cache hit for model '{model}'")
+            logger.info("Request %s | Cache hit for model '%s'", request_id, model)
             return EmbeddingResponse(**cached_response)
     
     try:
@@ -48,25 +57,25 @@ async def create_embeddings(
         # Create the embeddings
         response = await service.create_embeddings(body)
         
-        # Store in cache if needed
-        if settings.CACHE_ENABLED:
-            await cache_set(create_cache_key("embedding", body.dict()), response.dict())
+        # Store in cache if needed, reusing the cache key computed above
+        if cache_key:
+            await cache_set(cache_key, response.model_dump())
         
-        duration = time.time() - start_time
-        logger.info(f"Request {request_id} | Completed in {duration:.2f}s")
+        duration = (time.perf_counter_ns() - start_time) / 1e9
+        logger.info("Request %s | Completed in %.2fs", request_id, duration)
         
         return response
     except ModelNotFoundError as e:
-        logger.error(f"Request {request_id} | Model not found: {model}")
+        logger.error("Request %s | Model not found: %s", request_id, model)
         raise e
     except ServiceUnavailableError as e:
-        logger.error(f"Request {request_id} | Service unavailable for provider: {provider}")
+        logger.error("Request %s | Service unavailable for provider: %s", request_id, provider)
         raise e
     except ProviderError as e:
-        logger.error(f"Request {request_id} | Provider error: {str(e)}")
+        logger.error("Request %s | Provider error: %s", request_id, e)
         raise e
     except Exception as e:
-        logger.error(f"Request {request_id} | Unexpected error: {str(e)}", exc_info=True)
+        logger.error("Request %s | Unexpected error: %s", request_id, e, exc_info=True)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Unexpected error: {str(e)}"
@@ -1,7 +1,10 @@
 from fastapi import APIRouter, Depends, Request, HTTPException, status, Query
-from typing import Optional, List
+from fastapi.responses import Response
+from typing import Dict, Optional, List, Tuple
+import asyncio
 import time
 import logging
+import orjson
 
 from ...core.models import ModelInfo, ModelListResponse
 from ...core.errors import ServiceUnavailableError, ModelNotFoundError
@@ -12,8 +15,20 @@ from ..dependencies import get_service, get_all_services, get_request_id
 
 logger = logging.getLogger("llm_gateway.api.routers.models")
 
+# Bound once at import: settings are static for the process lifetime and a
+# module-global read is cheaper than Pydantic attribute access per request
+_CACHE_ENABLED = settings.CACHE_ENABLED
+
 router = APIRouter(prefix="/v1", tags=["Models"])
 
+# In-process TTL cache for /v1/models, keyed by (provider, capability).
+# Storing the already-serialized JSON bytes lets hot hits skip the Redis
+# round-trip, Pydantic re-validation and response encoding entirely; Redis
+# is still written through for cross-worker freshness.
+_MODELS_CACHE_TTL_SECONDS = 30
+_MODELS_CACHE_MAX_ENTRIES = 64
+_models_cache: Dict[Tuple[Optional[str], Optional[str]], Tuple[float, bytes]] = {}
+
 @router.get("/models", response_model=ModelListResponse)
 async def list_models(
     request: Request,
@@ -27,18 +42,28 @@ async def list_models(
     This endpoint lists all available models across all providers,
     with optional filtering by provider and capability.
     """
-    start_time = time.time()
+    start_time = time.perf_counter_ns()
     
-    logger.info(f"Request {request_id} | List models (provider: {provider or 'all'}, capability: {capability or 'all'})")
+    logger.info("Request %s | List models (provider: %s, capability: %s)", request_id, provider or "all", capability or "all")
     
+    # Serve from the in-process cache when fresh; like the Redis layer
+    # below, it honours CACHE_ENABLED so disabling caching really does
+    # recompute every response
+    local_key = (provider, capability)
+    if _CACHE_ENABLED:
+        cached_entry = _models_cache.get(local_key)
+        if cached_entry and time.monotonic() - cached_entry[0] < _MODELS_CACHE_TTL_SECONDS:
+            logger.info("Request %s | In-process cache hit for models list", request_id)
+            return Response(content=cached_entry[1], media_type="application/json")
+
     # Try to get from cache if caching is enabled
     cache_key = None
-    if settings.CACHE_ENABLED:
+    if _CACHE_ENABLED:
         cache_params = {"provider": provider, "capability": capability}
         cache_key = create_cache_key("models", cache_params)
         cached_response = await cache_get(cache_key)
         if cached_response:
-            logger.info(f"Request {request_id} | Cache hit for models list")
+            logger.info("Request %s | Cache hit for models list", request_id)
             return ModelListResponse(**cached_response)
     
     try:
@@ -50,14 +75,18 @@ async def list_models(
             provider_models = await service.get_models()
             models.extend(provider_models)
         else:
-            # Get models from all available providers
+            # Get models from all available providers concurrently; total
+            # latency is the slowest provider rather than the sum of all
             services = await get_all_services()
-            for service in services:
-                try:
-                    provider_models = await service.get_models()
-                    models.extend(provider_models)
-                except Exception as e:
-                    logger.warning(f"Failed to get models from provider {service.provider_name}: {str(e)}")
+            results = await asyncio.gather(
+                *[service.get_models() for service in services],
+                return_exceptions=True
+            )
+            for service, result in zip(services, results):
+                if isinstance(result, Exception):
+                    logger.warning("Failed to get models from provider %s: %s", service.provider_name, result)
+                else:
+                    models.extend(result)
         
         # Filter by capability if specified
         if capability:
@@ -70,19 +99,27 @@ async def list_models(
             data=models
         )
         
+        # Serialize once: the bytes feed both the in-process cache and the
+        # response itself
+        payload = orjson.dumps(response.model_dump())
+        if _CACHE_ENABLED:
+            if len(_models_cache) >= _MODELS_CACHE_MAX_ENTRIES:
+                _models_cache.clear()
+            _models_cache[local_key] = (time.monotonic(), payload)
+        
         # Store in cache if needed
-        if settings.CACHE_ENABLED and cache_key:
-            await cache_set(cache_key, response.dict(), ttl=300)  # Cache for 5 minutes
+        if _CACHE_ENABLED and cache_key:
+            await cache_set(cache_key, response.model_dump(), ttl=300)  # Cache for 5 minutes
         
-        duration = time.time() - start_time
-        logger.info(f"Request {request_id} | Completed in {duration:.2f}s, found {len(models)} models")
+        duration = (time.perf_counter_ns() - start_time) / 1e9
+        logger.info("Request %s | Completed in %.2fs, found %d models", request_id, duration, len(models))
         
-        return response
+        return Response(content=payload, media_type="application/json")
     except ServiceUnavailableError as e:
-        logger.error(f"Request {request_id} | Service unavailable: {str(e)}")
+        logger.error("Request %s | Service unavailable: %s", request_id, e)
         raise e
     except Exception as e:
-        logger.error(f"Request {request_id} | Unexpected error: {str(e)}", exc_info=True)
+        logger.error("Request %s | Unexpected error: %s", request_id, e, exc_info=True)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Unexpected error: {str(e)}"
@@ -101,18 +138,18 @@ async def get_model(
     This endpoint returns detailed information about a specific model,
     optionally from a specific provider.
     """
-    start_time = time.time()
+    start_time = time.perf_counter_ns()
     
-    logger.info(f"Request {request_id} | Get model '{model_id}' (provider: {provider or 'default'})")
+    logger.info("Request %s | Get model '%s' (provider: %s)", request_id, model_id, provider or "default")
     
     # Try to get from cache if caching is enabled
     cache_key = None
-    if settings.CACHE_ENABLED:
+    if _CACHE_ENABLED:
         cache_params = {"model_id": model_id, "provider": provider}
         cache_key = create_cache_key("model", cache_params)
         cached_response = await cache_get(cache_key)
         if cached_response:
-            logger.info(f"Request {request_id} | Cache hit for model '{model_id}'")
+            logger.info("Request %s | Cache hit for model '%s'", request_id, model_id)
             return ModelInfo(**cached_response)
     
     try:
@@ -123,38 +160,53 @@ async def get_model(
             if not model_info:
                 raise ModelNotFoundError(f"Model '{model_id}' not found for provider '{provider}'")
         else:
-            # Try to find the model across all providers
+            # Query all providers concurrently and take the first hit; the
+            # remaining lookups are cancelled so one slow provider doesn't
+            # gate the response
             services = await get_all_services()
             model_info = None
-            
-            for service in services:
-                try:
-                    info = await service.get_model_info(model_id)
+
+            tasks = [
+                asyncio.create_task(service.get_model_info(model_id))
+                for service in services
+            ]
+            pending = set(tasks)
+            while pending and model_info is None:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    try:
+                        info = task.result()
+                    except Exception:
+                        continue
                     if info:
                         model_info = info
                         break
-                except Exception:
-                    continue
-            
+
+            # Cancel and reap any still-running lookups to avoid task leaks
+            if pending:
+                for task in pending:
+                    task.cancel()
+                await asyncio.gather(*pending, return_exceptions=True)
+
             if not model_info:
                 raise ModelNotFoundError(f"Model '{model_id}' not found")
         
         # Store in cache if needed
-        if settings.CACHE_ENABLED and cache_key:
+        if _CACHE_ENABLED and cache_key:
             await cache_set(cache_key, model_info.dict(), ttl=300)  # Cache for 5 minutes
         
-        duration = time.time() - start_time
-        logger.info(f"Request {request_id} | Completed in {duration:.2f}s")
+        duration = (time.perf_counter_ns() - start_time) / 1e9
+        logger.info("Request %s | Completed in %.2fs", request_id, duration)
         
         return model_info
     except ModelNotFoundError as e:
-        logger.error(f"Request {request_id} | Model not found: {model_id}")
+        logger.error("Request %s | Model not found: %s", request_id, model_id)
         raise e
     except ServiceUnavailableError as e:
-        logger.error(f"Request {request_id} | Service unavailable: {str(e)}")
+        logger.error("Request %s | Service unavailable: %s", request_id, e)
         raise e
     except Exception as e:
-        logger.error(f"Request {request_id} | Unexpected error: {str(e)}", exc_info=True)
+        logger.error("Request %s | Unexpected error: %s", request_id, e, exc_info=True)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Unexpected error: {str(e)}"
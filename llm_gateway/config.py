@@ -1,6 +1,7 @@
 import os
-from typing import Dict, List, Optional, Any
-from pydantic import Field
+import json
+from typing import Dict, FrozenSet, List, Optional, Any
+from pydantic import Field, PrivateAttr, field_validator
 from pydantic_settings import BaseSettings, SettingsConfigDict
 import logging
 
@@ -13,6 +14,7 @@ class Settings(BaseSettings):
     HOST: str = "0.0.0.0"
     DEBUG: bool = False
     ENV: str = "development"
+    WORKERS: int = 1
     
     # Security
     API_KEY_HEADER: str = "X-API-Key"
@@ -24,20 +26,26 @@ class Settings(BaseSettings):
     RATE_LIMIT_ENABLED: bool = True
     RATE_LIMIT_MAX_REQUESTS: int = 100
     RATE_LIMIT_WINDOW_SECONDS: int = 60
+    # "fixed" or "approximate_sliding" (see core.utils.is_rate_limited_sliding)
+    RATE_LIMIT_STRATEGY: str = "fixed"
     
     # Caching
     CACHE_ENABLED: bool = True
     CACHE_TTL_SECONDS: int = 300
     REDIS_URL: Optional[str] = None
+    REDIS_POOL_SIZE: int = 10
+    REDIS_POOL_TIMEOUT: int = 5
     
     # Providers
     DEFAULT_PROVIDER: str = "ollama"
     FALLBACK_PROVIDERS: List[str] = Field(default_factory=lambda: ["ollama"])
     PROVIDER_MODEL_MAPPING: Dict[str, List[str]] = Field(default_factory=dict)
+    MODEL_LIST_TTL_SECONDS: int = 60
     
     # Ollama Configuration
     OLLAMA_BASE_URL: str = "http://localhost:11434"
     OLLAMA_TIMEOUT: int = 30
+    OLLAMA_MAX_CONCURRENCY: int = 8
     
     model_config = SettingsConfigDict(
         env_file=".env",
@@ -45,22 +53,33 @@ class Settings(BaseSettings):
         case_sensitive=True,
     )
     
-    def __init__(self, **kwargs):
-        super().__init__(**kwargs)
-        # Process comma-separated environment variables
-        if isinstance(self.API_KEYS, str):
-            self.API_KEYS = self.API_KEYS.split(",")
-        if isinstance(self.FALLBACK_PROVIDERS, str):
-            self.FALLBACK_PROVIDERS = self.FALLBACK_PROVIDERS.split(",")
-        
-        # Process provider model mapping from environment
-        if isinstance(self.PROVIDER_MODEL_MAPPING, str):
+    # Frozenset view of API_KEYS, precomputed once so the authentication
+    # middleware validates keys with an O(1) hash lookup per request
+    _api_keys_set: FrozenSet[str] = PrivateAttr(default_factory=frozenset)
+    
+    @field_validator("API_KEYS", "FALLBACK_PROVIDERS", mode="before")
+    @classmethod
+    def _split_comma_separated(cls, value):
+        """Parse comma-separated environment variables into lists."""
+        if isinstance(value, str):
+            return value.split(",")
+        return value
+    
+    @field_validator("PROVIDER_MODEL_MAPPING", mode="before")
+    @classmethod
+    def _parse_provider_model_mapping(cls, value):
+        """Parse the provider model mapping from a JSON environment variable."""
+        if isinstance(value, str):
             try:
-                import json
-                self.PROVIDER_MODEL_MAPPING = json.loads(self.PROVIDER_MODEL_MAPPING)
+                return json.loads(value)
             except Exception as e:
                 logger.error(f"Error parsing PROVIDER_MODEL_MAPPING: {e}")
-                self.PROVIDER_MODEL_MAPPING = {}
+                return {}
+        return value
+    
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self._api_keys_set = frozenset(self.API_KEYS)
         
         # Log loaded settings
         logger.info(f"AUTH_ENABLED: {self.AUTH_ENABLED}")
@@ -7,10 +7,20 @@ class LLMGatewayError(Exception):
     status_code: int = status.HTTP_500_INTERNAL_SERVER_ERROR
     error_code: str = ErrorCode.INTERNAL_SERVER_ERROR
     error_message: str = "An unexpected error occurred"
-    
+
+    # Default payload per class, built once; errors raised with the class
+    # defaults (the common case for auth and rate-limit rejections) reuse it
+    # in to_dict instead of rebuilding the nested dict per response. Shared
+    # across instances — serialize it, never mutate it.
+    _base_error: Dict[str, str] = {"code": error_code, "message": error_message}
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls._base_error = {"code": cls.error_code, "message": cls.error_message}
+
     def __init__(
-        self, 
-        message: Optional[str] = None, 
+        self,
+        message: Optional[str] = None,
         status_code: Optional[int] = None,
         error_code: Optional[str] = None,
         details: Optional[Dict[str, Any]] = None
@@ -20,9 +30,16 @@ class LLMGatewayError(Exception):
         self.error_code = error_code or self.error_code
         self.details = details or {}
         super().__init__(self.error_message)
-    
+
     def to_dict(self) -> Dict[str, Any]:
         """Convert the error to a dictionary for API responses."""
+        base = self._base_error
+        if (
+            not self.details
+            and self.error_code == base["code"]
+            and self.error_message == base["message"]
+        ):
+            return {"error": base}
         error_dict = {
             "error": {
                 "code": self.error_code,
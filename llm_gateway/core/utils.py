@@ -1,11 +1,15 @@
-import uuid
+import os
 import time
-import json
+import asyncio
+import functools
 import logging
-from typing import Any, Dict, List, Optional, Union
-from datetime import datetime, timedelta
-import hashlib
+import reprlib
+from types import MappingProxyType
+from typing import Any, Dict, List, Mapping, Optional, Tuple, Union
+import orjson
 import redis
+import redis.asyncio as aioredis
+import xxhash
 from fastapi import Request
 from ..config import settings
 from .constants import CACHE_KEY_PREFIX
@@ -14,40 +18,83 @@ from .constants import CACHE_KEY_PREFIX
 logger = logging.getLogger("llm_gateway")
 
 def generate_request_id() -> str:
-    """Generate a unique request ID."""
-    return str(uuid.uuid4())
+    """Generate a unique request ID.
+
+    96 random bits as 24 hex chars — plenty for correlation, and cheaper than
+    constructing and formatting a full UUID object per request.
+    """
+    return os.urandom(12).hex()
 
 def get_timestamp() -> str:
-    """Get current timestamp in ISO format."""
-    return datetime.utcnow().isoformat() + "Z"
+    """Get current timestamp in ISO format.
+
+    Formats straight from the epoch with time.strftime instead of building
+    a datetime object per call — same ISO-8601 shape (microseconds, "Z"
+    suffix) at a fraction of the allocation cost on hot log paths.
+    """
+    t = time.time()
+    return f"{time.strftime('%Y-%m-%dT%H:%M:%S', time.gmtime(t))}.{int(t % 1 * 1e6):06d}Z"
 
 def calculate_hash(data: Any) -> str:
-    """Calculate a hash of the input data for caching."""
-    if isinstance(data, dict):
-        # Sort the dict to ensure consistent hashing
-        data = json.dumps(data, sort_keys=True)
-    return hashlib.sha256(str(data).encode()).hexdigest()
+    """Calculate a hash of the input data for caching.
+
+    Cache keys don't need cryptographic strength, so the data is serialized
+    once with orjson (sorted keys for a canonical encoding, str() fallback
+    for non-JSON types) and hashed with 128-bit XXH3 — both run at memory
+    speed, where json.dumps + SHA-256 was CPU-bound on multi-kB prompts.
+    """
+    encoded = orjson.dumps(data, option=orjson.OPT_SORT_KEYS, default=str)
+    return xxhash.xxh3_128_hexdigest(encoded)
 
 def create_cache_key(prefix: str, data: Any) -> str:
     """Create a cache key from a prefix and data."""
     return f"{CACHE_KEY_PREFIX}{prefix}:{calculate_hash(data)}"
 
-# Redis connection (lazy loaded)
-_redis_client = None
+def create_cache_key_from_bytes(prefix: str, raw: bytes) -> str:
+    """Create a cache key by hashing already-encoded bytes.
+
+    Hashing the raw request body skips the Pydantic-to-dict walk and JSON
+    re-encode that calculate_hash needs, so keying a multi-kB prompt costs a
+    single pass over bytes that already exist.
+    """
+    return f"{CACHE_KEY_PREFIX}{prefix}:{xxhash.xxh3_64_hexdigest(raw)}"
+
+# Redis connection (lazy loaded, shared bounded pool)
+_redis_pool: Optional[aioredis.BlockingConnectionPool] = None
+_redis_client: Optional[aioredis.Redis] = None
+_redis_init_lock = asyncio.Lock()
+
+async def get_redis_client() -> Optional[aioredis.Redis]:
+    """Get an async Redis client if Redis is configured.
 
-def get_redis_client() -> Optional[redis.Redis]:
-    """Get a Redis client if Redis is configured."""
-    global _redis_client
+    Connections come from a bounded BlockingConnectionPool sized by
+    REDIS_POOL_SIZE: under load, callers briefly wait (up to
+    REDIS_POOL_TIMEOUT seconds) for a free connection instead of opening an
+    unbounded number of sockets against the Redis server. Initialization is
+    guarded by a lock so concurrent first requests build exactly one pool.
+    Each connection names itself "llm_gateway" so it is identifiable in
+    CLIENT LIST output. Connectivity is verified once at startup (see the
+    lifespan handler in main), not per call.
+    """
+    global _redis_pool, _redis_client
     if not settings.REDIS_URL:
         return None
     if _redis_client is None:
-        try:
-            _redis_client = redis.from_url(settings.REDIS_URL)
-            # Test connection
-            _redis_client.ping()
-        except redis.RedisError as e:
-            logger.error(f"Failed to connect to Redis: {str(e)}")
-            _redis_client = None
+        async with _redis_init_lock:
+            if _redis_client is None:
+                try:
+                    _redis_pool = aioredis.BlockingConnectionPool.from_url(
+                        settings.REDIS_URL,
+                        max_connections=settings.REDIS_POOL_SIZE,
+                        timeout=settings.REDIS_POOL_TIMEOUT,
+                        client_name="llm_gateway",
+                        decode_responses=False,
+                    )
+                    _redis_client = aioredis.Redis(connection_pool=_redis_pool)
+                except redis.RedisError as e:
+                    logger.error(f"Failed to connect to Redis: {str(e)}")
+                    _redis_pool = None
+                    _redis_client = None
     return _redis_client
 
 async def cache_get(key: str) -> Optional[Any]:
@@ -55,50 +102,158 @@ async def cache_get(key: str) -> Optional[Any]:
     if not settings.CACHE_ENABLED:
         return None
     
-    redis_client = get_redis_client()
+    redis_client = await get_redis_client()
     if redis_client:
         try:
-            value = redis_client.get(key)
+            value = await redis_client.get(key)
             if value:
-                return json.loads(value)
+                return orjson.loads(value)
         except Exception as e:
             logger.error(f"Error getting from cache: {str(e)}")
     return None
 
 async def cache_set(key: str, value: Any, ttl: Optional[int] = None) -> bool:
-    """Set a value in the cache."""
+    """Set a value in the cache.
+
+    Values are encoded with orjson, which serializes straight to bytes —
+    the largest single allocation on a cached chat response path goes away
+    along with the json.dumps str round-trip.
+    """
     if not settings.CACHE_ENABLED:
         return False
-    
+
+    ttl = ttl or settings.CACHE_TTL_SECONDS
+    redis_client = await get_redis_client()
+    if redis_client:
+        try:
+            await redis_client.setex(key, ttl, orjson.dumps(value, default=str))
+            return True
+        except Exception as e:
+            logger.error(f"Error setting cache: {str(e)}")
+    return False
+
+async def cache_set_many(items: Dict[str, Any], ttl: Optional[int] = None) -> bool:
+    """Set several values in the cache with one round-trip.
+
+    All SETEX commands are queued on a single pipeline and executed
+    together, so N related writes (e.g. a response plus its side tables)
+    cost one RTT instead of N.
+    """
+    if not settings.CACHE_ENABLED or not items:
+        return False
+
     ttl = ttl or settings.CACHE_TTL_SECONDS
-    redis_client = get_redis_client()
+    redis_client = await get_redis_client()
     if redis_client:
         try:
-            redis_client.setex(key, ttl, json.dumps(value))
+            pipeline = redis_client.pipeline(transaction=False)
+            for key, value in items.items():
+                pipeline.setex(key, ttl, orjson.dumps(value, default=str))
+            await pipeline.execute()
             return True
         except Exception as e:
             logger.error(f"Error setting cache: {str(e)}")
     return False
 
-def is_rate_limited(key: str, max_requests: int, window_seconds: int) -> bool:
-    """Check if a key is rate limited."""
+# Fixed-window rate limit as a Lua script: the increment, the one-time
+# EXPIRE and the threshold comparison run atomically server-side, so the
+# check is a single EVALSHA round-trip and the window TTL is set exactly
+# once instead of being refreshed (and thereby extended) on every request.
+_RATE_LIMIT_LUA = """
+local current = redis.call('INCR', KEYS[1])
+if current == 1 then
+    redis.call('EXPIRE', KEYS[1], ARGV[2])
+end
+if current > tonumber(ARGV[1]) then
+    return 1
+end
+return 0
+"""
+
+# Approximate sliding window (Cloudflare's algorithm): weight the previous
+# window's count by the fraction of it still inside the sliding window and
+# add the current count. Two counters and O(1) work per request regardless
+# of the limit — an exact sliding log would cost O(limit) per check on a
+# single-threaded Redis.
+_RATE_LIMIT_SLIDING_LUA = """
+local cur = tonumber(redis.call('GET', KEYS[1]) or '0')
+local prev = tonumber(redis.call('GET', KEYS[2]) or '0')
+local weighted = prev * (1 - tonumber(ARGV[2])) + cur
+if weighted >= tonumber(ARGV[1]) then
+    return 1
+end
+if redis.call('INCR', KEYS[1]) == 1 then
+    redis.call('EXPIRE', KEYS[1], ARGV[3])
+end
+return 0
+"""
+
+# script source -> loaded SHA, shared by all rate-limit variants
+_script_shas: Dict[str, str] = {}
+
+async def _eval_script(redis_client: aioredis.Redis, script: str, keys: List[str], args: List[Any]) -> Any:
+    """Evaluate a Lua script by SHA, loading it on first use.
+
+    A NOSCRIPT reply (e.g. after a Redis restart flushed the script cache)
+    reloads the script transparently and retries once.
+    """
+    sha = _script_shas.get(script)
+    if sha is None:
+        sha = await redis_client.script_load(script)
+        _script_shas[script] = sha
+    try:
+        return await redis_client.evalsha(sha, len(keys), *keys, *args)
+    except redis.exceptions.NoScriptError:
+        sha = await redis_client.script_load(script)
+        _script_shas[script] = sha
+        return await redis_client.evalsha(sha, len(keys), *keys, *args)
+
+async def is_rate_limited(key: str, max_requests: int, window_seconds: int) -> bool:
+    """Check if a key is rate limited (fixed-window counter)."""
     if not settings.RATE_LIMIT_ENABLED:
         return False
-    
-    redis_client = get_redis_client()
+
+    redis_client = await get_redis_client()
     if not redis_client:
         return False
-    
+
     try:
-        current = redis_client.get(f"rate:{key}")
-        if current and int(current) >= max_requests:
-            return True
-        
-        pipeline = redis_client.pipeline()
-        pipeline.incr(f"rate:{key}")
-        pipeline.expire(f"rate:{key}", window_seconds)
-        pipeline.execute()
+        rate_key = f"rate:{key}"
+        limited = await _eval_script(
+            redis_client, _RATE_LIMIT_LUA, [rate_key], [max_requests, window_seconds]
+        )
+        return bool(int(limited))
+    except Exception as e:
+        logger.error(f"Error checking rate limit: {str(e)}")
+        return False
+
+async def is_rate_limited_sliding(key: str, max_requests: int, window_seconds: int) -> bool:
+    """Check if a key is rate limited (approximate sliding window).
+
+    Smooths the burst-at-window-boundary artifact of the fixed window: up to
+    2x the limit can pass a fixed window straddle, while the weighted
+    two-bucket estimate stays within a few percent of a true sliding log.
+    Buckets expire after two windows so the previous counter survives just
+    long enough to be interpolated.
+    """
+    if not settings.RATE_LIMIT_ENABLED:
         return False
+
+    redis_client = await get_redis_client()
+    if not redis_client:
+        return False
+
+    try:
+        now = time.time()
+        cur_bucket = int(now // window_seconds)
+        elapsed_fraction = (now % window_seconds) / window_seconds
+        limited = await _eval_script(
+            redis_client,
+            _RATE_LIMIT_SLIDING_LUA,
+            [f"rate:{key}:{cur_bucket}", f"rate:{key}:{cur_bucket - 1}"],
+            [max_requests, elapsed_fraction, 2 * window_seconds],
+        )
+        return bool(int(limited))
     except Exception as e:
         logger.error(f"Error checking rate limit: {str(e)}")
         return False
@@ -116,34 +271,60 @@ def truncate_string(text: str, max_length: int = 100) -> str:
         return text
     return text[:max_length - 3] + "..."
 
+# Repr with per-element limits, so logging a params dict clips each large
+# value (multi-kB prompts included) while it is being formatted instead of
+# materializing the full repr and throwing most of it away
+_params_repr = reprlib.Repr()
+_params_repr.maxstring = 60
+_params_repr.maxother = 60
+_params_repr.maxdict = 8
+_params_repr.maxlist = 8
+
+def truncate_repr(obj: Any, max_length: int = 100) -> str:
+    """Build a size-bounded repr of an object for logging."""
+    return truncate_string(_params_repr.repr(obj), max_length)
+
 def log_request(request_id: str, endpoint: str, client_ip: str, params: Dict[str, Any]) -> None:
-    """Log information about an incoming request."""
+    """Log information about an incoming request.
+
+    Gated on isEnabledFor so the params repr — the expensive part — is
+    never built when INFO records would be dropped anyway; %s formatting
+    defers the rest to the handler.
+    """
+    if not logger.isEnabledFor(logging.INFO):
+        return
     logger.info(
-        f"Request {request_id} | Endpoint: {endpoint} | Client: {client_ip} | "
-        f"Params: {truncate_string(str(params))}"
+        "Request %s | Endpoint: %s | Client: %s | Params: %s",
+        request_id, endpoint, client_ip, truncate_repr(params)
     )
 
 def log_response(request_id: str, status_code: int, duration_ms: float) -> None:
     """Log information about an outgoing response."""
     logger.info(
-        f"Response {request_id} | Status: {status_code} | Duration: {duration_ms:.2f}ms"
+        "Response %s | Status: %s | Duration: %.2fms",
+        request_id, status_code, duration_ms
     )
 
 def log_error(request_id: str, error: Exception, context: Optional[Dict[str, Any]] = None) -> None:
     """Log detailed information about an error."""
     logger.error(
-        f"Error {request_id} | Type: {type(error).__name__} | Message: {str(error)} | "
-        f"Context: {context or {}}"
+        "Error %s | Type: %s | Message: %s | Context: %s",
+        request_id, type(error).__name__, error, context or {}
     )
 
-def get_provider_mapping() -> Dict[str, List[str]]:
+@functools.lru_cache(maxsize=1)
+def get_provider_mapping() -> Mapping[str, Tuple[str, ...]]:
     """
     Get a mapping of model names to their compatible providers.
-    This mapping helps the service factory determine which provider 
+    This mapping helps the service factory determine which provider
     should be used for a specific model.
-    
+
+    The mapping only changes when settings change, so it is computed once
+    and memoized; the read-only proxy over tuple values keeps callers from
+    mutating the shared cached copy.
+
     Returns:
-        A dictionary mapping provider names to lists of compatible model IDs.
+        A read-only mapping of provider names to tuples of compatible model IDs.
     """
     # This would ideally be loaded from a database or configuration file
     # For now, we hardcode the mapping for demonstration purposes
@@ -157,7 +338,7 @@ def get_provider_mapping() -> Dict[str, List[str]]:
             "gemma"
         ]
     }
-    
+
     # Try to load additional mappings from settings if available
     try:
         if hasattr(settings, "PROVIDER_MODEL_MAPPING") and settings.PROVIDER_MODEL_MAPPING:
@@ -171,24 +352,34 @@ def get_provider_mapping() -> Dict[str, List[str]]:
                     mapping[provider].append(models)
     except ImportError:
         pass
-    
-    return mapping
+
+    return MappingProxyType({provider: tuple(models) for provider, models in mapping.items()})
+
+@functools.lru_cache(maxsize=1)
+def get_model_to_providers() -> Mapping[str, Tuple[str, ...]]:
+    """
+    Get the inverse of get_provider_mapping: model ID to compatible providers.
+
+    Built once from the provider mapping so compatibility lookups are a
+    single dict access instead of a scan over every provider's model list.
+
+    Returns:
+        A read-only mapping of model IDs to tuples of provider names.
+    """
+    inverse: Dict[str, List[str]] = {}
+    for provider, models in get_provider_mapping().items():
+        for model_id in models:
+            inverse.setdefault(model_id, []).append(provider)
+    return MappingProxyType({model_id: tuple(providers) for model_id, providers in inverse.items()})
 
 def get_compatible_providers(model_id: str) -> List[str]:
     """
     Get a list of providers that are compatible with the specified model.
-    
+
     Args:
         model_id: The ID of the model.
-    
+
     Returns:
         A list of provider names that can handle the model.
     """
-    mapping = get_provider_mapping()
-    providers = []
-    
-    for provider, models in mapping.items():
-        if model_id in models:
-            providers.append(provider)
-    
-    return providers 
\ No newline at end of file
+    return list(get_model_to_providers().get(model_id, ())) 
\ No newline at end of file
@@ -1,24 +1,89 @@
+import asyncio
 import logging
 import os
 import time
+from contextlib import asynccontextmanager, suppress
+import orjson
 import uvicorn
 from fastapi import FastAPI, Request, Response
-from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
 from prometheus_client import make_asgi_app
 
 from .config import settings
 from .api.errors import register_exception_handlers
 from .api.middleware import register_middleware
 from .api.routers import chat, embeddings, models
+from .core.utils import get_redis_client
+from .services.ollama_service import close_http_client
+
+class FastJsonFormatter(logging.Formatter):
+    """Minimal JSON log formatter.
+
+    Emits the record's raw epoch timestamp instead of asctime — the text
+    formatter's strftime/localtime pair (which takes a glibc mutex) ran on
+    every record — and serializes the whole line in one orjson pass rather
+    than Python-level string concatenation.
+    """
+
+    def format(self, record: logging.LogRecord) -> str:
+        payload = {
+            "ts": record.created,
+            "lvl": record.levelname,
+            "name": record.name,
+            "msg": record.getMessage(),
+        }
+        if record.exc_info:
+            payload["exc"] = self.formatException(record.exc_info)
+        return orjson.dumps(payload, default=str).decode()
 
 # Configure logging
+_log_handler = logging.StreamHandler()
+_log_handler.setFormatter(FastJsonFormatter())
 logging.basicConfig(
     level=logging.INFO if not settings.DEBUG else logging.DEBUG,
-    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
+    handlers=[_log_handler],
 )
 
 logger = logging.getLogger("llm_gateway")
 
+# How often the known-model sets on each service are refreshed in the
+# background, keeping the synchronous compatibility checks answering from
+# memory (see BaseLLMService.is_compatible_with_model)
+_MODEL_REFRESH_INTERVAL_SECONDS = 60
+
+async def _refresh_known_models_loop():
+    """Periodically refresh each service's cached model-ID set."""
+    from .services.factory import service_factory
+
+    while True:
+        await asyncio.sleep(_MODEL_REFRESH_INTERVAL_SECONDS)
+        try:
+            for service in await service_factory.get_all_services():
+                await service.refresh_known_models()
+        except Exception as e:
+            # A transient provider failure must not kill the loop; the next
+            # interval retries
+            logger.warning("Model refresh failed: %s", e)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Application lifespan: verify external connections once at startup."""
+    redis_client = await get_redis_client()
+    if redis_client:
+        try:
+            await redis_client.ping()
+            logger.info("Connected to Redis")
+        except Exception as e:
+            logger.error(f"Failed to connect to Redis: {str(e)}")
+    refresh_task = asyncio.create_task(_refresh_known_models_loop())
+    yield
+    refresh_task.cancel()
+    with suppress(asyncio.CancelledError):
+        await refresh_task
+    await close_http_client()
+    if redis_client:
+        await redis_client.aclose()
+
 # Create the FastAPI application
 app = FastAPI(
     title="LLM Gateway",
@@ -26,15 +91,12 @@ app = FastAPI(
     version="0.1.0",
     docs_url="/docs",
     redoc_url="/redoc",
-)
-
-# Add CORS middleware
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=["*"],
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
+    # orjson serializes every JSON endpoint; chat completions are 10-100 kB
+    # of JSON per response, where stdlib json is several times slower.
+    # Streaming SSE responses are unaffected — StreamingResponse bypasses
+    # the default response class.
+    default_response_class=ORJSONResponse,
+    lifespan=lifespan,
 )
 
 # Register error handlers
@@ -43,39 +105,100 @@ register_exception_handlers(app)
 # Register middleware
 register_middleware(app)
 
+# Health endpoints served by a pure ASGI short-circuit ahead of routing:
+# probes run continuously on every pod, and this path allocates no Request,
+# runs no dependency injection and serializes nothing per hit. A Mount
+# won't do here — Starlette 307-redirects bare /health to /health/, which
+# breaks probes that don't follow redirects. /health serves a constant
+# body; /health/detail splices in the timestamp.
+_HEALTH_BODY = b'{"status":"ok"}'
+_HEALTH_HEADERS = [
+    (b"content-type", b"application/json"),
+    (b"content-length", str(len(_HEALTH_BODY)).encode()),
+]
+_HEALTH_DETAIL_PREFIX = orjson.dumps({"status": "ok", "version": app.version})[:-1] + b',"timestamp":'
+
+async def _health(scope, receive, send):
+    """Serve health probes without entering FastAPI routing."""
+    path = scope["path"]
+    if path in ("/health", "/health/"):
+        await send({"type": "http.response.start", "status": 200, "headers": _HEALTH_HEADERS})
+        await send({"type": "http.response.body", "body": _HEALTH_BODY})
+        return
+    if path == "/health/detail":
+        body = _HEALTH_DETAIL_PREFIX + str(int(time.time())).encode() + b"}"
+        await send({
+            "type": "http.response.start",
+            "status": 200,
+            "headers": [(b"content-type", b"application/json")],
+        })
+        await send({"type": "http.response.body", "body": body})
+        return
+    await send({"type": "http.response.start", "status": 404, "headers": []})
+    await send({"type": "http.response.body", "body": b""})
+
+class HealthCheckMiddleware:
+    """Route /health* straight to the health callable, skipping the app."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http" and scope["path"].startswith("/health"):
+            return await _health(scope, receive, send)
+        await self.app(scope, receive, send)
+
+# Outermost middleware: probes never touch auth, CORS or routing
+app.add_middleware(HealthCheckMiddleware)
+
 # Include routers
 app.include_router(chat.router)
 app.include_router(embeddings.router)
 app.include_router(models.router)
 
-# Metrics endpoint
-metrics_app = make_asgi_app()
+# Metrics endpoint. When PROMETHEUS_MULTIPROC_DIR is set (e.g. under
+# uvicorn --workers), each worker records metrics in its own mmap file and
+# the scrape aggregates across them — metric updates stay lock-free per
+# worker and counters are no longer overwritten between processes.
+if "PROMETHEUS_MULTIPROC_DIR" in os.environ:
+    from prometheus_client import CollectorRegistry, multiprocess
+
+    metrics_registry = CollectorRegistry()
+    multiprocess.MultiProcessCollector(metrics_registry)
+    metrics_app = make_asgi_app(registry=metrics_registry)
+else:
+    metrics_app = make_asgi_app()
 app.mount("/metrics", metrics_app)
 
-@app.get("/health")
-async def health_check():
-    """Health check endpoint."""
-    return {
-        "status": "ok",
-        "version": app.version,
-        "timestamp": int(time.time())
-    }
+# Serialized once at import: the root body is constant, so it never passes
+# through Pydantic or a JSON encoder per hit
+_ROOT_PAYLOAD_BYTES = orjson.dumps({
+    "name": "LLM Gateway",
+    "version": app.version,
+    "description": "A unified API gateway for LLM providers",
+    "docs_url": "/docs",
+    "health_check": "/health"
+})
 
 @app.get("/")
 async def root():
     """Root endpoint with API information."""
-    return {
-        "name": "LLM Gateway",
-        "version": app.version,
-        "description": "A unified API gateway for LLM providers",
-        "docs_url": "/docs",
-        "health_check": "/health"
-    }
+    return Response(content=_ROOT_PAYLOAD_BYTES, media_type="application/json")
 
 if __name__ == "__main__":
+    # uvloop + httptools swap the selector event loop and the Python h11
+    # parser for libuv and a C parser. uvicorn's own log config is disabled
+    # so it doesn't fight the JSON logging set up above, and access logging
+    # — the largest per-request cost in uvicorn itself — stays off outside
+    # debug; the middleware's request/response lines cover it.
     uvicorn.run(
         "llm_gateway.main:app",
         host=settings.HOST,
         port=settings.PORT,
-        reload=settings.DEBUG
-    ) 
\ No newline at end of file
+        reload=settings.DEBUG,
+        workers=settings.WORKERS,
+        loop="uvloop",
+        http="httptools",
+        log_config=None,
+        access_log=settings.DEBUG,
+    )
\ No newline at end of file
@@ -1,5 +1,5 @@
 from abc import ABC, abstractmethod
-from typing import Any, Dict, List, Optional, Union
+from typing import Any, AsyncIterator, Dict, FrozenSet, List, Optional, Union
 from ..core.models import (
     ChatCompletionRequest, 
     ChatCompletionResponse,
@@ -40,6 +40,18 @@ class BaseLLMService(ABC):
     ) -> EmbeddingResponse:
         """Create embeddings for the given text."""
         pass
+
+    def stream_chat_completion(
+        self, request: ChatCompletionRequest
+    ) -> AsyncIterator[bytes]:
+        """Stream a chat completion as already-encoded SSE byte frames.
+
+        Providers that support streaming override this; frames are piped to
+        the client as-is so the response is never materialized in memory.
+        """
+        raise NotImplementedError(
+            f"Provider '{self.provider_name}' does not support streaming"
+        )
     
     @abstractmethod
     async def check_health(self) -> bool:
@@ -58,20 +70,34 @@ class BaseLLMService(ABC):
         """Format chat messages into a prompt string for the specified model."""
         pass
 
+    # Lowercased IDs of the models last seen from this provider, refreshed
+    # whenever a model listing succeeds (and periodically from the lifespan
+    # task in main). Lets the synchronous compatibility check answer from
+    # memory instead of calling the provider.
+    _known_model_ids: FrozenSet[str] = frozenset()
+
+    def _remember_models(self, models: List[ModelInfo]) -> None:
+        """Record the model IDs from a successful listing."""
+        self._known_model_ids = frozenset(model.id.lower() for model in models)
+
+    async def refresh_known_models(self) -> None:
+        """Refresh the known-model set; listing errors leave the old set."""
+        try:
+            self._remember_models(await self.get_models())
+        except Exception:
+            pass
+
     def is_compatible_with_model(self, model_id: str) -> bool:
-        """Check if this service is compatible with the given model."""
-        # Si le modèle commence par le nom du fournisseur, on le considère comme compatible
-        if model_id.lower().startswith(self.provider_name.lower()):
+        """Check if this service is compatible with the given model.
+
+        Purely synchronous and in-memory: a provider-prefix check, then the
+        cached model-ID set. The previous implementation called
+        asyncio.run(self.get_models()) here, which fails inside a running
+        event loop and blocks on a network round-trip when it doesn't;
+        callers that need a fresh listing use the async path in
+        ServiceFactory._is_compatible_with_model.
+        """
+        mid = model_id.lower()
+        if mid.startswith(self.provider_name.lower()):
             return True
-        
-        # Sinon on vérifie si ce modèle est disponible dans le fournisseur
-        try:
-            import asyncio
-            models = asyncio.run(self.get_models())
-            for model in models:
-                if model.id.lower() == model_id.lower():
-                    return True
-            return False
-        except:
-            # En cas d'erreur, on utilise la méthode simple
-            return model_id.lower() == self.provider_name.lower() 
\ No newline at end of file
+        return mid in self._known_model_ids 
\ No newline at end of file
@@ -1,13 +1,16 @@
-from typing import Dict, List, Optional, Any, Type
+from typing import Dict, FrozenSet, List, Optional, Any, Tuple, Type
+import functools
 import logging
+import time
 from abc import ABC
+from collections import defaultdict
 import asyncio
 
 from ..config import settings
 from ..core.errors import ModelNotFoundError, ServiceUnavailableError
 from .base import BaseLLMService
 from .ollama_service import OllamaService
-from ..core.utils import get_provider_mapping
+from ..core.utils import get_provider_mapping, get_model_to_providers
 
 logger = logging.getLogger("llm_gateway.services.factory")
 
@@ -21,6 +24,12 @@ class ServiceFactory:
     _services: Dict[str, BaseLLMService] = {}
     _service_classes: Dict[str, Type[BaseLLMService]] = {}
     _model_provider_mapping: Dict[str, List[str]] = {}
+    # Per-provider TTL cache of lowercased model IDs, so compatibility
+    # checks don't hit the provider's HTTP API on every request. Each
+    # provider refreshes under its own lock to avoid a thundering herd of
+    # identical list calls when an entry expires.
+    _models_cache: Dict[str, Tuple[float, FrozenSet[str]]] = {}
+    _models_cache_locks: Dict[str, asyncio.Lock] = defaultdict(asyncio.Lock)
     
     def __new__(cls):
         """Singleton pattern implementation."""
@@ -33,9 +42,20 @@ class ServiceFactory:
         """Initialize the factory with available service providers."""
         # Register available service classes
         self._register_service_class("ollama", OllamaService)
-        
-        # Load model-provider mapping
-        self._model_provider_mapping = get_provider_mapping()
+
+        # Construct every registered service eagerly. Services are cheap to
+        # build (no I/O in their constructors) and this keeps get_service a
+        # plain dict lookup with no check-then-insert race: two concurrent
+        # first requests can no longer each build a service and leak the
+        # loser's connections.
+        for provider_name, service_class in self._service_classes.items():
+            self._services[provider_name] = service_class()
+
+        # Load model-provider mapping. The shared mapping is memoized and
+        # read-only, so take a mutable copy for runtime registrations.
+        self._model_provider_mapping = {
+            provider: list(models) for provider, models in get_provider_mapping().items()
+        }
     
     def _register_service_class(self, provider_name: str, service_class: Type[BaseLLMService]):
         """Register a service class for a provider."""
@@ -61,20 +81,13 @@ class ServiceFactory:
         # If no provider specified, use the default
         if not provider_name:
             provider_name = settings.DEFAULT_PROVIDER
-        
-        # Normalize provider name
-        provider_name = provider_name.lower()
-        
-        # Check if the service is already instantiated
-        if provider_name in self._services:
-            return self._services[provider_name]
-        
-        # Create a new service instance if possible
-        if provider_name in self._service_classes:
-            service = self._service_classes[provider_name]()
-            self._services[provider_name] = service
+
+        # All registered providers are constructed at init, so the hot path
+        # is a single dict lookup
+        service = self._services.get(provider_name.lower())
+        if service is not None:
             return service
-        
+
         # Provider not supported
         raise ServiceUnavailableError(f"Provider '{provider_name}' is not supported")
     
@@ -99,60 +112,66 @@ class ServiceFactory:
             ModelNotFoundError: If no service can handle the model.
             ServiceUnavailableError: If the provider is not available.
         """
-        # Try the preferred provider first
-        if preferred_provider:
-            try:
-                service = self.get_service(preferred_provider)
-                if await self._is_compatible_with_model(service, model_id):
-                    return service
-            except ServiceUnavailableError:
-                # If the preferred provider is not available, try others
-                logger.warning(f"Preferred provider '{preferred_provider}' is not available, trying others")
-        
-        # Check if we have a mapping for this model
-        for provider, models in self._model_provider_mapping.items():
-            if model_id in models:
-                try:
-                    service = self.get_service(provider)
-                    if await self._is_compatible_with_model(service, model_id):
-                        return service
-                except ServiceUnavailableError:
-                    logger.warning(f"Mapped provider '{provider}' for model '{model_id}' is not available, trying others")
-        
-        # Try the default provider
-        try:
-            service = self.get_service(settings.DEFAULT_PROVIDER)
-            if await self._is_compatible_with_model(service, model_id):
-                return service
-        except ServiceUnavailableError:
-            # If the default provider is not available, try others
-            logger.warning(f"Default provider '{settings.DEFAULT_PROVIDER}' is not available, trying others")
-        
-        # Try all providers in the fallback list
-        for provider_name in settings.FALLBACK_PROVIDERS:
+        for provider_name in self._provider_order(model_id, preferred_provider):
             try:
                 service = self.get_service(provider_name)
-                if await self._is_compatible_with_model(service, model_id):
-                    return service
             except ServiceUnavailableError:
+                logger.warning(f"Provider '{provider_name}' is not available for model '{model_id}', trying others")
                 continue
-        
+            if await self._is_compatible_with_model(service, model_id):
+                return service
+
         # If we reach here, no service can handle the model
         raise ModelNotFoundError(f"No provider available for model '{model_id}'")
+
+    @functools.lru_cache(maxsize=4096)
+    def _provider_order(self, model_id: str, preferred_provider: Optional[str]) -> Tuple[str, ...]:
+        """Get the ordered, deduplicated providers to try for a model.
+
+        Preferred provider first, then mapped providers, then the default,
+        then the fallback list. Memoized so the mapping scan and the
+        branching ladder run once per (model, preference) pair instead of
+        on every request; the factory is a singleton, so caching on the
+        bound method holds a single extra reference.
+        """
+        candidates = []
+        if preferred_provider:
+            candidates.append(preferred_provider.lower())
+        for provider, models in self._model_provider_mapping.items():
+            if model_id in models:
+                candidates.append(provider)
+        candidates.append(settings.DEFAULT_PROVIDER.lower())
+        candidates.extend(provider.lower() for provider in settings.FALLBACK_PROVIDERS)
+        return tuple(dict.fromkeys(candidates))
     
+    async def _get_model_ids(self, service: BaseLLMService) -> FrozenSet[str]:
+        """Get the service's model IDs, cached for MODEL_LIST_TTL_SECONDS."""
+        provider = service.provider_name.lower()
+        entry = self._models_cache.get(provider)
+        if entry and time.monotonic() - entry[0] < settings.MODEL_LIST_TTL_SECONDS:
+            return entry[1]
+
+        async with self._models_cache_locks[provider]:
+            # Re-check under the lock: a concurrent caller may have
+            # refreshed while we waited
+            entry = self._models_cache.get(provider)
+            if entry and time.monotonic() - entry[0] < settings.MODEL_LIST_TTL_SECONDS:
+                return entry[1]
+            models = await service.get_models()
+            model_ids = frozenset(model.id.lower() for model in models)
+            self._models_cache[provider] = (time.monotonic(), model_ids)
+            return model_ids
+
     async def _is_compatible_with_model(self, service: BaseLLMService, model_id: str) -> bool:
         """Check if a service is compatible with a model using non-blocking methods."""
         # First do a quick check with the synchronous method
         if service.is_compatible_with_model(model_id):
             return True
-            
-        # If that fails, try to get models asynchronously to confirm
+
+        # If that fails, confirm against the (cached) model listing
         try:
-            models = await service.get_models()
-            for model in models:
-                if model.id.lower() == model_id.lower():
-                    return True
-            return False
+            model_ids = await self._get_model_ids(service)
+            return model_id.lower() in model_ids
         except Exception as e:
             logger.warning(f"Error checking model compatibility: {str(e)}")
             return False
@@ -190,6 +209,12 @@ class ServiceFactory:
         
         if model_id not in self._model_provider_mapping[provider_name]:
             self._model_provider_mapping[provider_name].append(model_id)
+            # Drop the memoized inverse index, the provider's cached model
+            # listing and the provider orderings so lookups see the new
+            # registration
+            get_model_to_providers.cache_clear()
+            self._models_cache.pop(provider_name, None)
+            self._provider_order.cache_clear()
     
     def get_provider_for_model(self, model_id: str) -> Optional[str]:
         """
@@ -1,12 +1,15 @@
+import asyncio
 import json
+import re
 import time
 import httpx
-from typing import Any, Dict, List, Optional, Union
+import orjson
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple, Union
 import logging
 from tenacity import (
     retry,
     stop_after_attempt,
-    wait_exponential,
+    wait_exponential_jitter,
     retry_if_exception_type
 )
 
@@ -33,12 +36,85 @@ from ..core.constants import ModelCapability
 
 logger = logging.getLogger("llm_gateway.ollama")
 
+_JSON_CONTENT_TYPE = {"Content-Type": "application/json"}
+
+# Matches one whitespace-delimited word; used to count words without
+# materializing them
+_WORD_RE = re.compile(r"\S+")
+
+_DEFAULT_MODEL_NAMES = ("llama2", "mistral", "codellama", "phi", "gemma", "llama3.2:1b")
+
+# Lowercased lookup set for the compatibility check — O(1) membership with
+# zero per-call allocation
+_DEFAULT_MODEL_NAMES_LOWER = frozenset(name.lower() for name in _DEFAULT_MODEL_NAMES)
+
+# Every Ollama model advertises the same capabilities; shared by all the
+# model_construct calls below
+_CAPS = [ModelCapability.CHAT, ModelCapability.EMBEDDING]
+
+# Fallback ModelInfo objects, built once at import: the empty-listing and
+# error paths of get_models used to re-run six Pydantic constructions each
+# time they fired. model_construct skips validation — every field here is
+# a literal we control.
+_DEFAULT_MODELS: Tuple[ModelInfo, ...] = tuple(
+    ModelInfo.model_construct(
+        id=name,
+        name=name,
+        provider="ollama",
+        capabilities=_CAPS,
+        max_tokens=4096,  # Default for most Ollama models
+        description=f"Ollama model: {name}",
+        context_window=4096  # Default for most Ollama models
+    )
+    for name in _DEFAULT_MODEL_NAMES
+)
+
+# Single long-lived HTTP client shared by all Ollama calls. Building an
+# AsyncClient per request forced a DNS lookup and TCP connect every time;
+# the pooled client keeps connections warm across requests, bounded at 100
+# with 20 kept alive between bursts.
+_http_client: Optional[httpx.AsyncClient] = None
+
+def get_client() -> httpx.AsyncClient:
+    """Get the shared Ollama HTTP client, creating it on first use."""
+    global _http_client
+    if _http_client is None or _http_client.is_closed:
+        _http_client = httpx.AsyncClient(
+            # HTTP/2 is negotiated, not forced: against a proxy that speaks
+            # it, concurrent embedding requests multiplex over one
+            # connection instead of queueing head-of-line; plain-HTTP/1.1
+            # Ollama keeps working unchanged
+            http2=True,
+            timeout=httpx.Timeout(settings.OLLAMA_TIMEOUT),
+            limits=httpx.Limits(
+                max_connections=100,
+                max_keepalive_connections=20,
+                keepalive_expiry=300,
+            ),
+        )
+    return _http_client
+
+async def close_http_client() -> None:
+    """Close the shared HTTP client (called from the lifespan handler)."""
+    global _http_client
+    if _http_client is not None and not _http_client.is_closed:
+        await _http_client.aclose()
+    _http_client = None
+
 class OllamaService(BaseLLMService):
     """Implementation of the Ollama LLM service."""
-    
+
+    # How long a successful /api/tags listing is served from memory
+    _MODELS_CACHE_TTL_SECONDS = 60
+
     def __init__(self):
         self.base_url = settings.OLLAMA_BASE_URL
         self.timeout = settings.OLLAMA_TIMEOUT
+        self._models_cache: Optional[Tuple[float, List[ModelInfo]]] = None
+        self._models_by_id: Dict[str, ModelInfo] = {}
+        # Caps in-flight embedding requests: Ollama serializes work on the
+        # GPU anyway, so thousands of queued HTTP calls only add timeouts
+        self._embed_sema = asyncio.Semaphore(settings.OLLAMA_MAX_CONCURRENCY)
         
     @property
     def provider_name(self) -> str:
@@ -48,19 +124,48 @@ class OllamaService(BaseLLMService):
         self, method: str, endpoint: str, data: Optional[Dict[str, Any]] = None
     ) -> Dict[str, Any]:
         """Make a request to the Ollama API."""
+        if method.lower() == "post":
+            # Pre-serialize with orjson and pass raw bytes: httpx's json=
+            # kwarg would run stdlib json.dumps plus a UTF-8 encode on
+            # every multi-kB prompt body
+            return await self._post_raw(endpoint, orjson.dumps(data))
+        if method.lower() != "get":
+            raise ValueError(f"Unsupported HTTP method: {method}")
+
         url = f"{self.base_url}{endpoint}"
-        
         try:
-            async with httpx.AsyncClient(timeout=self.timeout) as client:
-                if method.lower() == "get":
-                    response = await client.get(url)
-                elif method.lower() == "post":
-                    response = await client.post(url, json=data)
-                else:
-                    raise ValueError(f"Unsupported HTTP method: {method}")
-                
-                response.raise_for_status()
-                return response.json()
+            client = get_client()
+            response = await client.get(url)
+            response.raise_for_status()
+            # orjson instead of response.json(): embedding replies carry
+            # multi-thousand-element float arrays, where stdlib json parsing
+            # is several times slower
+            return orjson.loads(response.content)
+        except httpx.TimeoutException as e:
+            logger.error(f"Timeout error connecting to Ollama: {str(e)}")
+            raise GatewayTimeoutError(f"Request to Ollama timed out: {str(e)}")
+        except httpx.HTTPStatusError as e:
+            logger.error(f"HTTP error from Ollama: {str(e)}")
+            if e.response.status_code == 404:
+                raise ModelNotFoundError(f"Model not found: {str(e)}")
+            else:
+                raise ProviderError(f"Error from Ollama API: {str(e)}")
+        except httpx.HTTPError as e:
+            logger.error(f"Error connecting to Ollama: {str(e)}")
+            raise ServiceUnavailableError(f"Ollama service unavailable: {str(e)}")
+
+    async def _post_raw(self, endpoint: str, body: bytes) -> Dict[str, Any]:
+        """POST an already-encoded JSON body to the Ollama API.
+
+        Taking bytes lets callers encode a body once and reuse the buffer
+        across fan-out requests and retries.
+        """
+        url = f"{self.base_url}{endpoint}"
+        try:
+            client = get_client()
+            response = await client.post(url, content=body, headers=_JSON_CONTENT_TYPE)
+            response.raise_for_status()
+            return orjson.loads(response.content)
         except httpx.TimeoutException as e:
             logger.error(f"Timeout error connecting to Ollama: {str(e)}")
             raise GatewayTimeoutError(f"Request to Ollama timed out: {str(e)}")
@@ -74,27 +179,39 @@ class OllamaService(BaseLLMService):
             logger.error(f"Error connecting to Ollama: {str(e)}")
             raise ServiceUnavailableError(f"Ollama service unavailable: {str(e)}")
     
+    # Jittered backoff: without jitter, every instance that failed together
+    # retries in lockstep, hammering Ollama exactly when it's unhealthy
     @retry(
         stop=stop_after_attempt(3),
-        wait=wait_exponential(multiplier=1, min=1, max=10),
+        wait=wait_exponential_jitter(initial=1, max=10, jitter=2),
         retry=retry_if_exception_type(ServiceUnavailableError)
     )
     async def get_models(self) -> List[ModelInfo]:
-        """Get a list of available models from Ollama."""
+        """Get a list of available models from Ollama.
+
+        Successful listings are cached in-process for
+        _MODELS_CACHE_TTL_SECONDS: get_model_info and the compatibility
+        checks all funnel through here, so repeated lookups within the
+        window hit memory instead of /api/tags.
+        """
+        cached = self._models_cache
+        if cached and time.monotonic() - cached[0] < self._MODELS_CACHE_TTL_SECONDS:
+            return cached[1]
+
         try:
             response = await self._make_request("GET", "/api/tags")
             models = []
             
+            # model_construct: the fields are strings and ints assembled
+            # right here, so full validation per model is pure overhead —
+            # it dominates cold-start time on large model lists
             for model_data in response.get("models", []):
                 name = model_data.get("name", "")
-                models.append(ModelInfo(
+                models.append(ModelInfo.model_construct(
                     id=name,
                     name=name,
                     provider=self.provider_name,
-                    capabilities=[
-                        ModelCapability.CHAT,
-                        ModelCapability.EMBEDDING
-                    ],
+                    capabilities=_CAPS,
                     max_tokens=4096,  # Default for most Ollama models
                     description=f"Ollama model: {name}",
                     context_window=4096  # Default for most Ollama models
@@ -102,130 +219,191 @@ class OllamaService(BaseLLMService):
             
             # Si aucun modèle n'est trouvé, fournir une liste par défaut
             if not models:
-                default_model_names = ["llama2", "mistral", "codellama", "phi", "gemma", "llama3.2:1b"]
-                for name in default_model_names:
-                    models.append(ModelInfo(
-                        id=name,
-                        name=name,
-                        provider=self.provider_name,
-                        capabilities=[
-                            ModelCapability.CHAT,
-                            ModelCapability.EMBEDDING
-                        ],
-                        max_tokens=4096,
-                        description=f"Ollama model: {name}",
-                        context_window=4096
-                    ))
-            
+                models = list(_DEFAULT_MODELS)
+
+            self._models_cache = (time.monotonic(), models)
+            self._models_by_id = {model.id.lower(): model for model in models}
+            self._remember_models(models)
             return models
         except Exception as e:
             logger.warning(f"Error getting models from Ollama: {str(e)}, returning default models")
             # En cas d'erreur, retourner une liste par défaut de modèles
-            default_model_names = ["llama2", "mistral", "codellama", "phi", "gemma", "llama3.2:1b"]
-            models = []
-            for name in default_model_names:
-                models.append(ModelInfo(
-                    id=name,
-                    name=name,
-                    provider=self.provider_name,
-                    capabilities=[
-                        ModelCapability.CHAT,
-                        ModelCapability.EMBEDDING
-                    ],
-                    max_tokens=4096,
-                    description=f"Ollama model: {name}",
-                    context_window=4096
-                ))
+            models = list(_DEFAULT_MODELS)
+            # Keep the lookup index usable while Ollama is down, but don't
+            # cache the fallback: the next call should retry the listing
+            self._models_by_id = {model.id.lower(): model for model in models}
             return models
-    
+
     async def get_model_info(self, model_id: str) -> Optional[ModelInfo]:
         """Get information about a specific model from Ollama."""
-        models = await self.get_models()
-        for model in models:
-            if model.id.lower() == model_id.lower():
-                return model
-        return None
+        await self.get_models()
+        return self._models_by_id.get(model_id.lower())
     
+    def _build_chat_data(
+        self, request: ChatCompletionRequest, stream: bool = False
+    ) -> Dict[str, Any]:
+        """Build the Ollama /api/chat request body from a gateway request."""
+        # Format messages for Ollama in one comprehension — no append
+        # lookup per message on long conversation histories
+        formatted_messages = [
+            {"role": msg.role, "content": msg.content} for msg in request.messages
+        ]
+
+        # Options in one expression: the optional keys merge in via
+        # conditional unpacking instead of build-then-mutate branches
+        stop = request.stop
+        options = {
+            "temperature": request.temperature,
+            "top_p": request.top_p,
+            **({"num_predict": request.max_tokens} if request.max_tokens else {}),
+            **({"stop": [stop] if isinstance(stop, str) else stop} if stop else {}),
+        }
+
+        return {
+            "model": request.model,
+            "messages": formatted_messages,
+            "stream": stream,
+            "options": options,
+        }
+
     async def create_chat_completion(
         self, request: ChatCompletionRequest
     ) -> ChatCompletionResponse:
-        """Create a chat completion using Ollama."""
+        """Create a chat completion using Ollama.
+
+        Internally consumes Ollama's streaming mode and joins the chunks:
+        peak memory holds one NDJSON line at a time instead of the full
+        generation buffered as a single JSON body, and the same wire path
+        serves both this method and endpoint-level SSE streaming.
+        """
         try:
-            # Extract request parameters
             model = request.model
-            messages = request.messages
-            temperature = request.temperature
-            top_p = request.top_p
-            max_tokens = request.max_tokens
-            stop = request.stop
-            
-            # Format messages for Ollama
-            formatted_messages = []
-            for msg in messages:
-                formatted_messages.append({
-                    "role": msg.role,
-                    "content": msg.content
-                })
-            
-            # Prepare the request data
-            data = {
-                "model": model,
-                "messages": formatted_messages,
-                "options": {
-                    "temperature": temperature,
-                    "top_p": top_p,
-                }
-            }
-            
-            if max_tokens:
-                data["options"]["num_predict"] = max_tokens
-                
-            if stop:
-                if isinstance(stop, str):
-                    data["options"]["stop"] = [stop]
-                else:
-                    data["options"]["stop"] = stop
-            
-            # Make the request to Ollama
-            start_time = time.time()
-            response = await self._make_request("POST", "/api/chat", data)
-            end_time = time.time()
-            
-            # Extract response
-            assistant_message = response.get("message", {})
-            content = assistant_message.get("content", "")
-            
-            # Create the response
-            completion = ChatCompletionResponse(
-                id=f"ollama-{int(time.time())}",
+            data = self._build_chat_data(request, stream=True)
+            url = f"{self.base_url}/api/chat"
+
+            content_parts: List[str] = []
+            final_chunk: Dict[str, Any] = {}
+            client = get_client()
+            async with client.stream(
+                "POST", url, content=orjson.dumps(data), headers=_JSON_CONTENT_TYPE
+            ) as response:
+                response.raise_for_status()
+                async for line in response.aiter_lines():
+                    if not line:
+                        continue
+                    chunk = orjson.loads(line)
+                    part = chunk.get("message", {}).get("content", "")
+                    if part:
+                        content_parts.append(part)
+                    if chunk.get("done"):
+                        final_chunk = chunk
+
+            content = "".join(content_parts)
+
+            # Single reads: each .get is a hash lookup, and the id and
+            # created fields should agree on the same second anyway
+            now = int(time.time())
+            prompt_tokens = final_chunk.get("prompt_eval_count", 0)
+            completion_tokens = final_chunk.get("eval_count", 0)
+
+            # Create the response; model_construct throughout — every field
+            # is computed locally from the provider reply
+            completion = ChatCompletionResponse.model_construct(
+                id=f"ollama-{now}",
                 object="chat.completion",
-                created=int(time.time()),
+                created=now,
                 model=model,
                 provider=self.provider_name,
                 choices=[
-                    ChatCompletionChoice(
+                    ChatCompletionChoice.model_construct(
                         index=0,
-                        message=Message(
+                        message=Message.model_construct(
                             role="assistant",
                             content=content
                         ),
                         finish_reason="stop"
                     )
                 ],
-                usage=Usage(
-                    prompt_tokens=response.get("prompt_eval_count", 0),
-                    completion_tokens=response.get("eval_count", 0),
-                    total_tokens=response.get("prompt_eval_count", 0) + response.get("eval_count", 0)
+                usage=Usage.model_construct(
+                    prompt_tokens=prompt_tokens,
+                    completion_tokens=completion_tokens,
+                    total_tokens=prompt_tokens + completion_tokens
                 )
             )
-            
+
             return completion
+        except httpx.TimeoutException as e:
+            logger.error(f"Timeout error connecting to Ollama: {str(e)}")
+            raise GatewayTimeoutError(f"Request to Ollama timed out: {str(e)}")
+        except httpx.HTTPStatusError as e:
+            logger.error(f"HTTP error from Ollama: {str(e)}")
+            if e.response.status_code == 404:
+                raise ModelNotFoundError(f"Model not found: {str(e)}")
+            raise ProviderError(f"Error from Ollama API: {str(e)}")
+        except httpx.HTTPError as e:
+            logger.error(f"Error connecting to Ollama: {str(e)}")
+            raise ServiceUnavailableError(f"Ollama service unavailable: {str(e)}")
         except Exception as e:
             logger.error(f"Error creating chat completion with Ollama: {str(e)}")
             if isinstance(e, (ModelNotFoundError, ProviderError, ServiceUnavailableError, GatewayTimeoutError)):
                 raise
             raise ProviderError(f"Failed to create chat completion with Ollama: {str(e)}")
-    
+
+    async def stream_chat_completion(
+        self, request: ChatCompletionRequest
+    ) -> AsyncIterator[bytes]:
+        """Stream a chat completion from Ollama as SSE byte frames.
+
+        Each Ollama NDJSON chunk is re-encoded exactly once with orjson and
+        yielded as a ready-to-send `data: ...` frame, so the full completion
+        is never buffered in the gateway.
+        """
+        model = request.model
+        data = self._build_chat_data(request, stream=True)
+        url = f"{self.base_url}/api/chat"
+        created = int(time.time())
+        completion_id = f"ollama-{created}"
+
+        try:
+            client = get_client()
+            async with client.stream(
+                "POST", url, content=orjson.dumps(data), headers=_JSON_CONTENT_TYPE
+            ) as response:
+                response.raise_for_status()
+                async for line in response.aiter_lines():
+                    if not line:
+                        continue
+                    chunk = orjson.loads(line)
+                    content = chunk.get("message", {}).get("content", "")
+                    done = chunk.get("done", False)
+                    frame = {
+                        "id": completion_id,
+                        "object": "chat.completion.chunk",
+                        "created": created,
+                        "model": model,
+                        "provider": self.provider_name,
+                        "choices": [
+                            {
+                                "index": 0,
+                                "delta": {"content": content},
+                                "finish_reason": "stop" if done else None
+                            }
+                        ]
+                    }
+                    yield b"data: " + orjson.dumps(frame) + b"\n\n"
+            yield b"data: [DONE]\n\n"
+        except httpx.TimeoutException as e:
+            logger.error(f"Timeout error streaming from Ollama: {str(e)}")
+            raise GatewayTimeoutError(f"Request to Ollama timed out: {str(e)}")
+        except httpx.HTTPStatusError as e:
+            logger.error(f"HTTP error from Ollama: {str(e)}")
+            if e.response.status_code == 404:
+                raise ModelNotFoundError(f"Model not found: {str(e)}")
+            raise ProviderError(f"Error from Ollama API: {str(e)}")
+        except httpx.HTTPError as e:
+            logger.error(f"Error streaming from Ollama: {str(e)}")
+            raise ServiceUnavailableError(f"Ollama service unavailable: {str(e)}")
+
     async def create_embeddings(
         self, request: EmbeddingRequest
     ) -> EmbeddingResponse:
@@ -240,38 +418,40 @@ class OllamaService(BaseLLMService):
             else:
                 input_texts = input_text
             
+            # Encode every request body up front — one dict and one dumps
+            # per input, with the byte buffers reused across any retries —
+            # then issue them concurrently, at most OLLAMA_MAX_CONCURRENCY
+            # in flight: enough parallelism to keep Ollama saturated
+            # without blowing up its queue on huge batches
+            bodies = [
+                orjson.dumps({"model": model, "prompt": text}) for text in input_texts
+            ]
+
+            async def _embed_one(body: bytes) -> Dict[str, Any]:
+                async with self._embed_sema:
+                    return await self._post_raw("/api/embeddings", body)
+
+            responses = await asyncio.gather(*[_embed_one(body) for body in bodies])
+
             embeddings = []
             total_tokens = 0
-            
-            # Process each text and get embedding
-            for i, text in enumerate(input_texts):
-                data = {
-                    "model": model,
-                    "prompt": text
-                }
-                
-                response = await self._make_request("POST", "/api/embeddings", data)
-                
-                # Extract embedding
-                embedding = response.get("embedding", [])
-                tokens = response.get("token_count", 0)
-                total_tokens += tokens
-                
+            for i, response in enumerate(responses):
+                total_tokens += response.get("token_count", 0)
                 embeddings.append(
-                    EmbeddingData(
+                    EmbeddingData.model_construct(
                         index=i,
-                        embedding=embedding,
+                        embedding=response.get("embedding", []),
                         object="embedding"
                     )
                 )
             
             # Create the response
-            embedding_response = EmbeddingResponse(
+            embedding_response = EmbeddingResponse.model_construct(
                 object="list",
                 data=embeddings,
                 model=model,
                 provider=self.provider_name,
-                usage=Usage(
+                usage=Usage.model_construct(
                     prompt_tokens=total_tokens,
                     completion_tokens=0,
                     total_tokens=total_tokens
@@ -299,59 +479,50 @@ class OllamaService(BaseLLMService):
         Count the number of tokens in the text for the given model.
         Note: This is a rough estimate as Ollama doesn't provide a dedicated tokenization endpoint.
         """
-        try:
-            # Use a simple approximation
-            return len(text.split()) * 4 // 3  # Rough estimate: 4 tokens for every 3 words
-        except Exception as e:
-            logger.error(f"Error counting tokens: {str(e)}")
-            return len(text.split())
+        # Count words by iterating regex matches: text.split() would
+        # materialize a list of every word (tens of thousands of str
+        # objects on a 100 kB prompt) just to take its length
+        words = sum(1 for _ in _WORD_RE.finditer(text))
+        return words * 4 // 3  # Rough estimate: 4 tokens for every 3 words
     
+    # Maps message roles to their prompt tag; replaces the if/elif chain
+    # with one dict lookup per message
+    _ROLE_TAG = {"system": "system", "user": "human", "assistant": "assistant"}
+
     def format_prompt(
         self, messages: List[Dict[str, Any]], model: str
     ) -> str:
-        """Format chat messages into a prompt string for the specified model."""
-        prompt = ""
+        """Format chat messages into a prompt string for the specified model.
+
+        Collects the pieces in a list and joins once: repeated `prompt +=`
+        re-allocates the whole string per message, turning long histories
+        quadratic.
+        """
+        parts = []
         for message in messages:
-            role = message.get("role", "").lower()
-            content = message.get("content", "")
-            
-            if role == "system":
-                prompt += f"<system>\n{content}\n</system>\n\n"
-            elif role == "user":
-                prompt += f"<human>\n{content}\n</human>\n\n"
-            elif role == "assistant":
-                prompt += f"<assistant>\n{content}\n</assistant>\n\n"
-        
+            tag = self._ROLE_TAG.get(message.get("role", "").lower())
+            if tag:
+                parts.append(f"<{tag}>\n{message.get('content', '')}\n</{tag}>\n\n")
+
         # Add final assistant prompt
-        prompt += "<assistant>\n"
-        
-        return prompt 
+        parts.append("<assistant>\n")
+
+        return "".join(parts)
     
     def is_compatible_with_model(self, model_id: str) -> bool:
-        """Check if this service is compatible with the given model."""
-        # Si le modèle est llama3.2:1b, on le considère toujours compatible avec Ollama
-        if model_id.lower() == "llama3.2:1b":
-            logger.info(f"Model {model_id} is explicitly supported by {self.provider_name}")
-            return True
-            
-        # Si le modèle commence par le nom du fournisseur, on le considère comme compatible
-        if model_id.lower().startswith(self.provider_name.lower()):
-            return True
-        
-        # Pour les autres modèles, on vérifie dans la liste
-        default_model_names = ["llama2", "mistral", "codellama", "phi", "gemma", "llama3.2:1b"]
-        if model_id.lower() in [name.lower() for name in default_model_names]:
-            logger.info(f"Model {model_id} is in the default supported models for {self.provider_name}")
+        """Check if this service is compatible with the given model.
+
+        One lowercase and three short-circuiting membership checks — no
+        network I/O, no event-loop work, safe to call from any routing
+        decision. Callers needing a fresh listing go through the factory's
+        async check instead.
+        """
+        mid = model_id.lower()
+        if (
+            mid.startswith("ollama")
+            or mid in _DEFAULT_MODEL_NAMES_LOWER
+            or mid in self._models_by_id
+        ):
             return True
-        
-        # En dernier recours, on essaie de récupérer la liste des modèles
-        try:
-            import asyncio
-            models = asyncio.run(self.get_models())
-            for model in models:
-                if model.id.lower() == model_id.lower():
-                    return True
-            return False
-        except Exception as e:
-            logger.warning(f"Error checking model compatibility: {str(e)}")
-            return False 
\ No newline at end of file
+        logger.debug("Model %s not known to provider ollama", model_id)
+        return False 
\ No newline at end of file